@@ -11,12 +11,14 @@
 
 import os
 import ROOT
-from array import array
+import numpy as np
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from tdrstyle_JERC import *
 import tdrstyle_JERC as TDR
+from root_file_utils import bin_array
 
 ROOT.gROOT.SetBatch(ROOT.kTRUE)
 ROOT.gStyle.SetOptStat(0)
@@ -41,6 +43,30 @@ def remove_z_axis(hist):
     UpdatePad()
 
 
+def rewrite_sentinels(arr, hot_value, cold_value, mask=None):
+    """
+    Replace the 100/-100 sentinels of a veto map bin buffer in place and
+    count the non-zero bins of each x column.
+
+    Args:
+        arr (numpy.ndarray): (ny+2, nx+2) view on the TH2 bin storage.
+        hot_value (float): Content written to bins flagged with 100.
+        cold_value (float): Content written to bins flagged with -100.
+        mask (numpy.ndarray, optional): Boolean scratch array of the same shape
+            as arr, reused across calls to avoid reallocating. Defaults to None.
+
+    Returns:
+        numpy.ndarray: Number of non-zero y-bins for each of the nx columns.
+    """
+    if mask is None:
+        mask = np.empty(arr.shape, dtype=bool)
+    np.equal(arr, 100, out=mask)
+    arr[mask] = hot_value
+    np.equal(arr, -100, out=mask)
+    arr[mask] = cold_value
+    return np.count_nonzero(arr[1:-1, 1:-1], axis=0)
+
+
 class PlotVetoMaps:
     """
     A class to load, verify, and plot jet veto maps (2D histograms).
@@ -53,9 +79,13 @@ class PlotVetoMaps:
         hnames (OrderedDict): The names of the histograms to retrieve from file.
         output_path (str): The directory path where plots will be saved.
         histos (OrderedDict): Dictionary of loaded ROOT histograms.
+        verify (bool): Whether plot() cross-checks the 'official' and 'all' maps.
     """
 
-    def __init__(self, year, file_name, file_version, lumi_info):
+    # Histograms that are loaded but not drawn by plot_jet_veto_map
+    SKIP_HISTS = {'asymmetry', 'pull', 'hotandcold', 'official', 'all'}
+
+    def __init__(self, year, file_name, file_version, lumi_info, verify=False):
         """
         Constructor for PlotVetoMaps.
 
@@ -64,11 +94,14 @@ class PlotVetoMaps:
             file_name (str): The base name of the input ROOT file.
             file_version (str): The version string of the input ROOT file.
             lumi_info (str): The luminosity string to display on plots.
+            verify (bool, optional): If True, plot() runs verify_content() first.
+                Defaults to False.
         """
         self.year = year
         self.file_name = file_name
         self.file_version = file_version
         self.lumi_info = lumi_info
+        self.verify = verify
 
         # Define histogram names to extract from the input ROOT file
         self.hnames = OrderedDict([
@@ -99,6 +132,7 @@ class PlotVetoMaps:
         # Load histograms
         self.histos = OrderedDict()
         self.load_histos()
+        self._plottable = tuple(name for name in self.histos if name not in self.SKIP_HISTS)
 
     def load_histos(self):
         """
@@ -112,12 +146,17 @@ class PlotVetoMaps:
             return
 
         root_file = ROOT.TFile(str(input_path), "READ")
+        # Index the keys once (first entry is the highest cycle) and read
+        # histograms straight from their TKey instead of a TFile.Get lookup
+        keys = {}
+        for key in root_file.GetListOfKeys():
+            keys.setdefault(key.GetName(), key)
         for name, hname in self.hnames.items():
-            hist = root_file.Get(hname)
             # If the histogram doesn't exist in file, skip it
-            if not hist:
+            if hname not in keys:
                 print(f"Warning: Histogram '{hname}' not found in {input_path}. Skipping...")
                 continue
+            hist = keys[hname].ReadObj()
             hist.SetDirectory(0)
             self.histos[name] = hist
 
@@ -134,16 +173,22 @@ class PlotVetoMaps:
             print("Warning: 'official' or 'all' histogram not found. Cannot verify content.")
             return
 
-        # Loop over bins and compare
-        for x in range(h_official.GetNbinsX() + 1):
-            for y in range(h_official.GetNbinsY() + 1):
-                off_content = h_official.GetBinContent(x, y)
-                all_content = h_all.GetBinContent(x, y)
-                if off_content != all_content:
-                    print(
-                        f"Different content in bin {x}-{y}: "
-                        f"{off_content} vs {all_content}"
-                    )
+        # Compare the bin buffers (including under/overflow) in one go
+        arr_off = bin_array(h_official)
+        arr_all = bin_array(h_all)
+        if arr_off.shape != arr_all.shape:
+            print(
+                f"Warning: 'official' and 'all' have different binning "
+                f"({arr_off.shape} vs {arr_all.shape}). Cannot compare bin contents."
+            )
+            return
+        if np.array_equal(arr_off, arr_all):
+            return
+        for y, x in np.argwhere(arr_off != arr_all):
+            print(
+                f"Different content in bin {x}-{y}: "
+                f"{arr_off[y, x]} vs {arr_all[y, x]}"
+            )
 
     def create_canvas(self, canv_name):
         """
@@ -203,24 +248,20 @@ class PlotVetoMaps:
         if is_ratio:
             canv_name += "_ratio"
 
-        # Histograms we do not plot in this method
-        skip_hists = ['asymmetry', 'pull', 'hotandcold', 'official', 'all']
-
         # Create the canvas
         canv = self.create_canvas(canv_name)
 
         # Build legend
         # Count how many histos we'll actually plot
-        n_hists = len(set(self.histos.keys()) - set(skip_hists))
+        n_hists = len(self._plottable)
         leg_height = 0.035 if not is_ratio else 0.045
         y2_legend = 0.81 if not is_ratio else 0.89
-        leg = tdrLeg(0.15, y2_legend - leg_height * n_hists, 0.35, y2_legend, 0.035)
-
-        if is_ratio:
-            leg = tdrLeg(
-                0.18, y2_legend - leg_height * n_hists,
-                0.35, y2_legend, 0.05
-            )
+        x1_legend = 0.15 if not is_ratio else 0.18
+        text_size = 0.035 if not is_ratio else 0.05
+        leg = tdrLeg(
+            x1_legend, y2_legend - leg_height * n_hists,
+            0.35, y2_legend, text_size
+        )
 
         # Predefine value ranges for coloring
         values = {
@@ -230,26 +271,41 @@ class PlotVetoMaps:
             'hbm2': 1.5, 'hbp12': 1, 'qie11': 0.1
         }
 
+        # Palette index of each map, based on its fraction between cold/hot
+        if TDR.MyPalette is None:
+            TDR.CreateAlternativePalette()
+        palette_len = len(TDR.MyPalette)
+        value_span = values['hot'] - values['cold']
+        color_index = {
+            name: min(int(palette_len * (value - values['cold']) / value_span), palette_len - 1)
+            for name, value in values.items()
+        }
+
+        # Non-zero y-bins per x column, filled during the sentinel rewrite
+        col_nz = {}
+        # Scratch mask shared by all (equally binned) maps
+        scratch = None
+
         # Plot each relevant histogram
-        for name, hist in self.histos.items():
-            if name in skip_hists:
-                continue
+        for name in self._plottable:
+            hist = self.histos[name]
 
             # Decide coloring
             is_hotcold = (name in ['hot', 'cold', 'all'])
             SetAlternative2DColor(hist)
             hist.GetZaxis().SetRangeUser(values['cold'], values['hot'])
 
-            # Replace "100"/"-100" with the relevant color-coded bin content
-            for x in range(hist.GetNbinsX() + 1):
-                for y in range(hist.GetNbinsY() + 1):
-                    bin_content = hist.GetBinContent(x, y)
-                    if (not is_hotcold) and (bin_content == 100):
-                        hist.SetBinContent(x, y, values[name])
-                    if bin_content == 100:
-                        hist.SetBinContent(x, y, values['hot'])
-                    if bin_content == -100:
-                        hist.SetBinContent(x, y, values['cold'] + 0.1)
+            # Replace "100"/"-100" with the relevant color-coded bin content,
+            # writing straight into the histogram's bin buffer
+            arr = bin_array(hist)
+            if scratch is None or scratch.shape != arr.shape:
+                scratch = np.empty(arr.shape, dtype=bool)
+            col_nz[name] = rewrite_sentinels(
+                arr,
+                values['hot'] if is_hotcold else values[name],
+                values['cold'] + 0.1,
+                mask=scratch
+            )
 
             # Draw
             if name == 'all':
@@ -258,12 +314,7 @@ class PlotVetoMaps:
                 hist.Draw('same box')
             else:
                 hist.Draw('same colz')
-                color = TDR.MyPalette[-1] if name == 'hot' else TDR.MyPalette[0]
-                if not is_hotcold:
-                    # Map color based on fraction between cold/hot
-                    fraction = (values[name] - values['cold']) / (values['hot'] - values['cold'])
-                    index = int(len(TDR.MyPalette) * fraction)
-                    color = TDR.MyPalette[min(index, len(TDR.MyPalette) - 1)]
+                color = TDR.MyPalette[color_index[name]]
                 remove_z_axis(hist)
                 hist.SetLineColor(ROOT.kBlack)
                 hist.SetFillColor(color)
@@ -291,34 +342,36 @@ class PlotVetoMaps:
             if not href:
                 print("Warning: 'all' histogram not found. Cannot create ratio.")
             else:
-                # Initialize ratio histograms
-                bins = href.GetXaxis().GetXbins()
-                fractions = OrderedDict({
-                    'hot':  ROOT.TH1F('hot',  'hot',  len(bins) - 1, array('d', bins)),
-                    'cold': ROOT.TH1F('cold', 'cold', len(bins) - 1, array('d', bins)),
-                    'else': ROOT.TH1F('else', 'else', len(bins) - 1, array('d', bins)),
-                    'all':  ROOT.TH1F('all',  'all',  len(bins) - 1, array('d', bins)),
-                })
-
-                for name, hist in self.histos.items():
-                    if name in skip_hists:
-                        continue
+                # Initialize ratio histograms with the eta binning of href:
+                # GetXbins() is empty for a uniform axis, so book those with
+                # (nbins, xmin, xmax) instead of the edge array
+                xaxis = href.GetXaxis()
+                bins = xaxis.GetXbins()
+                nbins = href.GetNbinsX()
+
+                def book(name):
+                    if bins.GetSize():
+                        return ROOT.TH1F(name, name, nbins, bins.GetArray())
+                    return ROOT.TH1F(name, name, nbins, xaxis.GetXmin(), xaxis.GetXmax())
+
+                fractions = OrderedDict(
+                    (name, book(name)) for name in ('hot', 'cold', 'else', 'all')
+                )
+
+                # If it's 'hot', consider 'all' bins?
+                ref_nz = np.count_nonzero(bin_array(href)[1:-1, 1:-1], axis=0)
+                ny = href.GetNbinsY()
+
+                for name, nz in col_nz.items():
                     is_hotcold = (name in ['hot', 'cold', 'all'])
                     frac_name = name if is_hotcold else 'else'
-                    for x in range(1, len(bins)):
-                        removed = sum(
-                            1 for y in range(1, hist.GetNbinsY() + 1)
-                            if hist.GetBinContent(x, y) != 0
-                        )
-                        # If it's 'hot', consider 'all' bins?
-                        if name == 'hot':
-                            removed = sum(
-                                1 for y in range(1, href.GetNbinsY() + 1)
-                                if href.GetBinContent(x, y) != 0
-                            )
-                        # Normalize to total Y bins
-                        removed /= href.GetNbinsY()
-                        fractions[frac_name].SetBinContent(x, removed)
+                    if name == 'hot':
+                        nz = ref_nz
+                    # Normalize to total Y bins
+                    removed_per_x = nz / ny
+                    bin_array(fractions[frac_name])[1:nbins + 1] = removed_per_x[:nbins]
+                    # Buffer writes bypass SetBinContent, so keep fEntries in sync
+                    fractions[frac_name].SetEntries(nbins)
 
                 # Draw the second pad with ratio histos
                 canv.cd(2)
@@ -354,7 +407,8 @@ class PlotVetoMaps:
         and produce standard veto map plots.
         """
         # Verify the content consistency of 'official' and 'all'
-        self.verify_content()
+        if self.verify:
+            self.verify_content()
 
         # Example: If you need asymmetry or pull plots, enable these:
         # self.PlotAsymmetry(mode='asymmetry')
@@ -367,9 +421,23 @@ class PlotVetoMaps:
         # self.plot_jet_veto_map(mode="ratio")
 
 
+def run_one(info):
+    """
+    Load and plot the veto maps of a single file version.
+
+    Args:
+        info (dict): Keyword arguments for PlotVetoMaps.
+    """
+    pvm = PlotVetoMaps(**info)
+    pvm.plot()
+
+
 def main():
     """
     Main function to run over a list of file versions and produce the plots.
+
+    Each file version is independent, so they are processed in parallel,
+    one process (with its own ROOT state) per version.
     """
     file_versions = [
         #{'year': 'Winter22Run3', 'file_name': 'Winter22Run3_RunCD', 'file_version': 'v1', 'lumi_info': '2022 RunCD, 7.6 fb^{-1}'},
@@ -385,9 +453,12 @@ def main():
        #  {'year': 'Summer20Run2', 'file_name': 'hotjets-Run2',       'file_version': 'v1', 'lumi_info': 'Run2, 138 fb^{-1}'},
     ]
 
-    for info in file_versions:
-        pvm = PlotVetoMaps(**info)
-        pvm.plot()
+    if not file_versions:
+        return
+
+    n_workers = min(len(file_versions), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        list(executor.map(run_one, file_versions))
 
 
 if __name__ == '__main__':
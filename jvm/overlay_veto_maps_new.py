@@ -12,14 +12,17 @@
 import os
 from pathlib import Path
 from collections import OrderedDict
-from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
+import numpy as np
 import ROOT
 import tdrstyle_JERC as TDR
 from tdrstyle_JERC import (
     UpdatePad, SetAlternative2DColor, tdrCanvas, tdrDiCanvas,
     GettdrCanvasHist, tdrLeg, tdrDraw, fixOverlay
 )
+from root_file_utils import bin_array
 
 # ROOT and style setup
 ROOT.gROOT.SetBatch(ROOT.kTRUE)
@@ -63,6 +66,18 @@ def remove_z_axis(hist: ROOT.TH2) -> None:
     UpdatePad()
 
 
+def rewrite_sentinels(arr: np.ndarray, hot_value: float, cold_value: float) -> np.ndarray:
+    """
+    Replace the 100/-100 sentinels of a bin-buffer view in place and return
+    the number of non-zero in-range phi bins of every eta column.
+    """
+    mask100 = arr == 100
+    mask_neg = arr == -100
+    arr[mask100] = hot_value
+    arr[mask_neg] = cold_value
+    return np.count_nonzero(arr[1:-1, 1:-1], axis=0)
+
+
 def load_histos(file_name: str, file_version: str) -> OrderedDict:
     """
     Load specified histograms from a ROOT file.
@@ -76,12 +91,16 @@ def load_histos(file_name: str, file_version: str) -> OrderedDict:
         return OrderedDict()
 
     root_file = ROOT.TFile(str(path), "READ")
+    # Index the keys once (first entry is the highest cycle)
+    keys = {}
+    for tkey in root_file.GetListOfKeys():
+        keys.setdefault(tkey.GetName(), tkey)
     histos = OrderedDict()
     for key, hname in HIST_NAMES.items():
-        hist = root_file.Get(hname)
-        if not hist:
+        if hname not in keys:
             print(f"Warning: '{hname}' not found. Skipping...")
             continue
+        hist = keys[hname].ReadObj()
         hist.SetDirectory(0)
         histos[key] = hist
     root_file.Close()
@@ -98,14 +117,14 @@ def verify_content(histos: dict) -> None:
         print("Warning: 'official' or 'all' histogram missing; skipping verification.")
         return
 
-    nx = h_official.GetNbinsX() + 1
-    ny = h_official.GetNbinsY() + 1
-    for ix in range(nx):
-        for iy in range(ny):
-            off = h_official.GetBinContent(ix, iy)
-            allc = h_all.GetBinContent(ix, iy)
-            if off != allc:
-                print(f"Bin ({ix},{iy}) differs: official={off} vs all={allc}")
+    # Compare both bin buffers at once
+    off = bin_array(h_official)
+    allc = bin_array(h_all)
+    if off.shape != allc.shape:
+        print(f"Warning: 'official' and 'all' have different binning ({off.shape} vs {allc.shape}); skipping verification.")
+        return
+    for iy, ix in np.argwhere(off != allc):
+        print(f"Bin ({ix},{iy}) differs: official={off[iy, ix]} vs all={allc[iy, ix]}")
 
 
 def create_canvas(name: str, lumi: str, year: str, ratio: bool = False) -> ROOT.TCanvas:
@@ -152,8 +171,11 @@ def plot_jet_veto_map(
     canv_name = f"jetvetomap_{file_name}{mode_suffix}"
     canv = create_canvas(canv_name, lumi, year, ratio)
 
+    # Histograms drawn by this function, in file order
+    active = [(key, hist) for key, hist in histos.items() if key not in SKIP_HISTS]
+
     # Legend setup
-    n_items = len(histos) - len(SKIP_HISTS & set(histos.keys()))
+    n_items = len(active)
     leg_h = 0.045 if ratio else 0.035
     y_top = 0.89 if ratio else 0.81
     leg = tdrLeg(0.18 if ratio else 0.15,
@@ -161,27 +183,32 @@ def plot_jet_veto_map(
                  0.35, y_top,
                  leg_h)
 
-    # Plot each histogram
-    for key, hist in histos.items():
-        if key in SKIP_HISTS:
-            continue
+    # Non-zero phi bins per eta column, taken during the sentinel rewrite
+    col_nz = {}
 
+    # Loop invariants for the color lookups
+    cold_lo, hot_hi = COLOR_RANGE['cold'], COLOR_RANGE['hot']
+    span = hot_hi - cold_lo
+    palette = None  # created by the first SetAlternative2DColor call
+
+    # Plot each histogram
+    for key, hist in active:
         is_hotcold = key in {'hot', 'cold', 'all'}
         SetAlternative2DColor(hist)
-        hist.GetZaxis().SetRangeUser(COLOR_RANGE['cold'], COLOR_RANGE['hot'])
-
-        # Replace sentinel bin values
-        nx = hist.GetNbinsX() + 1
-        ny = hist.GetNbinsY() + 1
-        for ix in range(nx):
-            for iy in range(ny):
-                val = hist.GetBinContent(ix, iy)
-                if not is_hotcold and val == 100:
-                    hist.SetBinContent(ix, iy, COLOR_VALUES.get(key, 0))
-                if val == 100:
-                    hist.SetBinContent(ix, iy, COLOR_RANGE['hot'])
-                if val == -100:
-                    hist.SetBinContent(ix, iy, COLOR_RANGE['cold'] + 0.1)
+        if palette is None:
+            palette = TDR.MyPalette
+            npal = len(palette)
+        hist.GetZaxis().SetRangeUser(cold_lo, hot_hi)
+        # Value written for vetoed bins; regions without a color value are
+        # drawn as hot rather than zeroed out of the map and the ratio counts
+        veto_value = hot_hi if is_hotcold else COLOR_VALUES.get(key, hot_hi)
+
+        # Replace sentinel bin values directly in the bin buffer
+        col_nz[key] = rewrite_sentinels(
+            bin_array(hist),
+            veto_value,
+            cold_lo + 0.1
+        )
 
         if key == 'all':
             hist.SetLineColor(ROOT.kBlack)
@@ -189,14 +216,11 @@ def plot_jet_veto_map(
         else:
             hist.Draw('same colz')
             # Choose fill color
-            if key in ('hot', 'cold', 'all'):
-                color = TDR.MyPalette[-1] if key == 'hot' else TDR.MyPalette[0]
+            if is_hotcold:
+                color = palette[-1] if key == 'hot' else palette[0]
             else:
-                frac = (COLOR_VALUES.get(key, 0) - COLOR_RANGE['cold']) / (
-                    COLOR_RANGE['hot'] - COLOR_RANGE['cold']
-                )
-                idx = min(int(len(TDR.MyPalette) * frac), len(TDR.MyPalette) - 1)
-                color = TDR.MyPalette[idx]
+                frac = (veto_value - cold_lo) / span
+                color = palette[min(int(npal * frac), npal - 1)]
             remove_z_axis(hist)
             hist.SetLineColor(ROOT.kBlack)
             hist.SetFillColor(color)
@@ -212,36 +236,33 @@ def plot_jet_veto_map(
         if not href:
             print("Warning: 'all' histogram missing; cannot draw ratio.")
         else:
-            # Prepare ratio histograms
-            bins = href.GetXaxis().GetXbins()
-            edges = list(bins) if bins.GetSize() else [
-                href.GetXaxis().GetBinLowEdge(i + 1)
-                for i in range(href.GetNbinsX() + 1)
-            ]
-            fractions = OrderedDict({
-                'hot':  ROOT.TH1F('hot',  'hot',  len(edges)-1, array('d', edges)),
-                'cold': ROOT.TH1F('cold', 'cold', len(edges)-1, array('d', edges)),
-                'else': ROOT.TH1F('else', 'else', len(edges)-1, array('d', edges)),
-                'all':  ROOT.TH1F('all',  'all',  len(edges)-1, array('d', edges)),
-            })
-
-            for key, hist in histos.items():
-                if key in SKIP_HISTS:
-                    continue
+            # Prepare ratio histograms with the eta binning of href: reuse its
+            # edge array when variable, else book with the uniform constructor
+            xaxis = href.GetXaxis()
+            bins = xaxis.GetXbins()
+
+            def book(name: str) -> ROOT.TH1F:
+                if bins.GetSize():
+                    return ROOT.TH1F(name, name, bins.GetSize() - 1, bins.GetArray())
+                return ROOT.TH1F(name, name, xaxis.GetNbins(), xaxis.GetXmin(), xaxis.GetXmax())
+
+            fractions = OrderedDict(
+                (name, book(name)) for name in ('hot', 'cold', 'else', 'all')
+            )
+
+            # For 'hot', base on href ('all' is not rewritten, so count it here)
+            ref_nz = np.count_nonzero(bin_array(href)[1:-1, 1:-1], axis=0)
+            ny = href.GetNbinsY()
+            for key, hist in active:
                 target = key if key in ('hot', 'cold', 'all') else 'else'
-                for ix in range(1, len(edges)):
-                    removed = sum(
-                        hist.GetBinContent(ix, iy) != 0
-                        for iy in range(1, hist.GetNbinsY() + 1)
-                    )
-                    # For 'hot', base on href
-                    if key == 'hot':
-                        removed = sum(
-                            href.GetBinContent(ix, iy) != 0
-                            for iy in range(1, href.GetNbinsY() + 1)
-                        )
-                    removed /= href.GetNbinsY()
-                    fractions[target].SetBinContent(ix, removed)
+                nz = ref_nz if key == 'hot' else col_nz[key]
+                # Fraction of non-zero phi bins in every eta column
+                per_col = nz / ny
+                # Bulk-write the fractions into the TH1F (float32) bin buffer
+                frac = fractions[target]
+                nbins = frac.GetNbinsX()
+                bin_array(frac)[1:-1] = per_col[:nbins]
+                frac.SetEntries(nbins)
 
             canv.cd(2)
             for fname, hist in fractions.items():
@@ -277,9 +298,30 @@ def plot_jet_veto_map(
     canv.Close()
 
 
+def process_version(info: dict, output_dir: Path) -> None:
+    """
+    Load, verify and plot the veto maps of a single file version.
+    """
+    histos = load_histos(info['file_name'], info['file_version'])
+    if not histos:
+        return
+    verify_content(histos)
+    plot_jet_veto_map(
+        histos,
+        info['file_name'],
+        output_dir,
+        info['lumi_info'],
+        info['year'],
+        ratio=False
+    )
+    # To also produce ratio plots, uncomment:
+    # plot_jet_veto_map(..., ratio=True)
+
+
 def main():
     """
-    Main entry point: iterate over file versions and produce veto map plots.
+    Main entry point: process the file versions in parallel (one process,
+    with its own ROOT state, per version) and produce veto map plots.
     """
     output_dir = Path('Pdfs') / 'VetoMaps'
     versions = [
@@ -291,21 +333,12 @@ def main():
         },
     ]
 
-    for info in versions:
-        histos = load_histos(info['file_name'], info['file_version'])
-        if not histos:
-            continue
-        verify_content(histos)
-        plot_jet_veto_map(
-            histos,
-            info['file_name'],
-            output_dir,
-            info['lumi_info'],
-            info['year'],
-            ratio=False
-        )
-        # To also produce ratio plots, uncomment:
-        # plot_jet_veto_map(..., ratio=True)
+    if not versions:
+        return
+
+    n_workers = min(len(versions), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        list(executor.map(process_version, versions, repeat(output_dir)))
 
 
 if __name__ == '__main__':
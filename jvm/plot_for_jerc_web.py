@@ -10,6 +10,7 @@ CMS TDR‑style jet‑veto overlay, “boxes only” version:
   • Save as jetvetomap_hotcold.png
 """
 
+import numpy as np
 import ROOT
 import tdrstyle_JERC as TDR
 from tdrstyle_JERC import (
@@ -17,6 +18,7 @@ from tdrstyle_JERC import (
     tdrCanvas, tdrLeg, GettdrCanvasHist,
     tdrDraw, fixOverlay
 )
+from root_file_utils import bin_array
 
 # === 1) CMS style setup ===
 ROOT.gROOT.SetBatch(True)
@@ -51,14 +53,22 @@ def build_masks(master, hot, cold):
     hotMask .Reset("ICESM")
     coldMask.Reset("ICESM")
     nx, ny = master.GetNbinsX(), master.GetNbinsY()
-    for ix in range(1, nx+1):
-        for iy in range(1, ny+1):
-            if master.GetBinContent(ix, iy) == 0:
-                continue
-            if hot.GetBinContent(ix, iy) != 0:
-                hotMask.SetBinContent(ix, iy, 1)
-            elif cold.GetBinContent(ix, iy) != 0:
-                coldMask.SetBinContent(ix, iy, 1)
+    for h in (hot, cold):
+        if (h.GetNbinsX(), h.GetNbinsY()) != (nx, ny):
+            raise ValueError(f"'{h.GetName()}' and '{master.GetName()}' have different binning")
+
+    # (ny+2, nx+2) views on the bin buffers, shared with ROOT
+    master_arr, hot_arr, cold_arr = bin_array(master), bin_array(hot), bin_array(cold)
+    vetoed = master_arr != 0
+    is_hot = vetoed & (hot_arr != 0)
+    is_cold = vetoed & ~is_hot & (cold_arr != 0)
+    # Only the in-range bins are considered; the masks start from zero
+    bin_array(hotMask)[1:-1, 1:-1][is_hot[1:-1, 1:-1]] = 1
+    bin_array(coldMask)[1:-1, 1:-1][is_cold[1:-1, 1:-1]] = 1
+    # Buffer writes bypass SetBinContent, so restore fEntries (Reset zeroed
+    # it and box/colz painting is skipped for histograms with no entries)
+    hotMask .SetEntries(int(np.count_nonzero(is_hot[1:-1, 1:-1])))
+    coldMask.SetEntries(int(np.count_nonzero(is_cold[1:-1, 1:-1])))
     return hotMask, coldMask
 
 
@@ -1,5 +1,8 @@
 import ROOT
 import sys
+import numpy as np
+
+from root_file_utils import copy_with_replacement, zero_bins
 
 # Hard-coded regions to remove: list of (etaMin, etaMax, phiMin, phiMax)
 REGIONS = [
@@ -34,42 +37,30 @@ def remove_regions(input_filename, output_filename, hist_name, regions):
     nbinsY = modified.GetNbinsY()
     print(f"Histogram dimensions: X bins = {nbinsX}, Y bins = {nbinsY}")
 
-    # Loop over bins and zero out regions
-    removed_bins = 0
-    for ix in range(1, nbinsX + 1):
-        eta = xaxis.GetBinCenter(ix)
-        for iy in range(1, nbinsY + 1):
-            phi = yaxis.GetBinCenter(iy)
-            for eta_min, eta_max, phi_min, phi_max in regions:
-                if eta_min < eta < eta_max and phi_min < phi < phi_max:
-                    modified.SetBinContent(ix, iy, 0)
-                    removed_bins += 1
-                    break
+    # Bin centers along each axis, tested against all regions at once
+    eta = np.array([xaxis.GetBinCenter(ix) for ix in range(1, nbinsX + 1)])
+    phi = np.array([yaxis.GetBinCenter(iy) for iy in range(1, nbinsY + 1)])
+    bounds = np.asarray(regions, dtype=np.float64).reshape(-1, 4)
+    # in_eta: (nRegions, nbinsX), in_phi: (nRegions, nbinsY)
+    in_eta = (bounds[:, 0, None] < eta) & (eta < bounds[:, 1, None])
+    in_phi = (bounds[:, 2, None] < phi) & (phi < bounds[:, 3, None])
+    # A bin is removed if any region contains it in both eta and phi
+    mask = np.any(in_phi[:, :, None] & in_eta[:, None, :], axis=0)
+
+    # Zero out the masked bins
+    try:
+        removed_bins = zero_bins(modified, mask)
+    except TypeError as e:
+        print(f"Error: {e}")
+        input_file.Close()
+        sys.exit(1)
     print(f"Zeroed out {removed_bins} bins within specified regions.")
 
-    # Write to output file
-    output_file = ROOT.TFile.Open(output_filename, "RECREATE")
-    if not output_file or output_file.IsZombie():
-        print(f"Error: Cannot create output file '{output_filename}'.")
+    # Copy all objects as-is, replacing the target histogram with modified
+    if not copy_with_replacement(input_file, output_filename, modified, hist_name):
         input_file.Close()
         sys.exit(1)
-    print(f"Opened output file: {output_filename}")
-
-    output_file.cd()
-
-    # Copy all objects, replacing the target histogram with modified
-    for key in input_file.GetListOfKeys():
-        kname = key.GetName()   # this is “jetasymmetrymap” (or “jetvetomap_hot”, etc.)
-        obj   = key.ReadObj()
-        
-        if kname == hist_name:
-            modified.Write(kname)             # write your zeroed‐out jetvetomap
-        else:
-            obj.Write(kname)                  # write every other object under its original key
-        print(f"Written '{kname}' to output file.")
-
 
-    output_file.Close()
     input_file.Close()
     print("All objects have been written to the output file successfully.")
 
@@ -20,6 +20,8 @@ from pathlib import Path
 import numpy as np
 import uproot  # Required only if interacting with ROOT files elsewhere
 
+from validation_utils import edges_match
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -46,13 +48,11 @@ def load_json_map(json_file_path: str, map_name: str):
         if not json_path.exists():
             raise FileNotFoundError(f"JSON file '{json_file_path}' does not exist.")
 
-        # Determine if the JSON is compressed
+        # Determine if the JSON is compressed; decompress in one call and let
+        # json.loads decode the bytes, instead of a text-mode gzip stream
+        json_content = json_path.read_bytes()
         if json_path.suffix == '.gz':
-            with gzip.open(json_path, 'rt') as f:
-                json_content = f.read()
-        else:
-            with open(json_path, 'r') as f:
-                json_content = f.read()
+            json_content = gzip.decompress(json_content)
 
         # Parse JSON content
         data = json.loads(json_content)
@@ -82,9 +82,10 @@ def load_json_map(json_file_path: str, map_name: str):
                 if len(edges) != 2:
                     raise ValueError(f"Map '{map_name}' does not have two edge arrays.")
 
-                x_edges = np.array(edges[0]).flatten()
-                y_edges = np.array(edges[1]).flatten()
-                bin_contents = np.array(value.get("content", [])).flatten()
+                # The JSON lists are already flat; convert them without extra copies
+                x_edges = np.asarray(edges[0], dtype=np.float64)
+                y_edges = np.asarray(edges[1], dtype=np.float64)
+                bin_contents = np.asarray(value.get("content", []), dtype=np.float64)
 
                 # Validate extracted data
                 if x_edges.size == 0 or y_edges.size == 0:
@@ -92,11 +93,11 @@ def load_json_map(json_file_path: str, map_name: str):
                 if bin_contents.size == 0:
                     raise ValueError(f"Map '{map_name}' has empty bin contents.")
 
-                print(x_edges)
-                print(y_edges)
-                print(bin_contents)
-                print(len(bin_contents))
-                print(sum(bin_contents))
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    logging.debug(
+                        f"Map '{map_name}': {x_edges.size - 1} x {y_edges.size - 1} bins, "
+                        f"{bin_contents.size} contents, sum = {bin_contents.sum()}"
+                    )
                 return x_edges, y_edges, bin_contents
 
         # If map not found after iterating
@@ -127,41 +128,39 @@ def compare_histograms(old_hist: tuple, new_hist: tuple, map_name: str, toleranc
     x_edges_new, y_edges_new, bin_contents_new = new_hist
 
     # Compare bin edges
-    if not np.allclose(x_edges_old, x_edges_new, atol=tolerance):
+    if not edges_match(x_edges_old, x_edges_new, tolerance):
         logging.error(f"X edges mismatch for map '{map_name}'.")
         sys.exit(1)
-    if not np.allclose(y_edges_old, y_edges_new, atol=tolerance):
+    if not edges_match(y_edges_old, y_edges_new, tolerance):
         logging.error(f"Y edges mismatch for map '{map_name}'.")
         sys.exit(1)
 
-    num_bins_old = len(bin_contents_old)
-    num_bins_new = len(bin_contents_new)
+    bin_contents_old = np.asarray(bin_contents_old, dtype=np.float64)
+    bin_contents_new = np.asarray(bin_contents_new, dtype=np.float64)
+    num_bins_old = bin_contents_old.size
+    num_bins_new = bin_contents_new.size
 
     if num_bins_new != num_bins_old:
         logging.error(f"Number of bins mismatch for map '{map_name}': Old JSON has {num_bins_old} bins, New JSON has {num_bins_new} bins.")
         sys.exit(1)
 
-    differences = 0
-
     logging.info(f"Comparing histograms for map '{map_name}':")
     logging.info(f"Total number of bins: {num_bins_old}")
 
     # Determine the number of phi bins from y_edges
     num_phi_bins = len(y_edges_old) - 1
 
-    for idx in range(num_bins_old):
-        old_val = bin_contents_old[idx]
-        new_val = bin_contents_new[idx]
-        diff = new_val - old_val  # Difference: new - old
-
-        if abs(diff) > tolerance:
-            differences += 1
-            # Calculate bin indices (assuming eta varies first, then phi)
-            eta_bin = (idx // num_phi_bins) + 1
-            phi_bin = (idx % num_phi_bins) + 1
-            logging.warning(
-                f"Difference found in bin (eta_bin={eta_bin}, phi_bin={phi_bin}): Old JSON={old_val}, New JSON={new_val}, Diff={diff}"
-            )
+    # Find all differing bins at once; only those are visited in Python
+    diff = bin_contents_new - bin_contents_old  # Difference: new - old
+    idxs = np.flatnonzero(np.abs(diff) > tolerance)
+    differences = int(idxs.size)
+
+    # Calculate bin indices (assuming eta varies first, then phi)
+    eta_bins, phi_bins = np.divmod(idxs, num_phi_bins)
+    for idx, eta_bin, phi_bin in zip(idxs, eta_bins + 1, phi_bins + 1):
+        logging.warning(
+            f"Difference found in bin (eta_bin={eta_bin}, phi_bin={phi_bin}): Old JSON={bin_contents_old[idx]}, New JSON={bin_contents_new[idx]}, Diff={diff[idx]}"
+        )
 
     if differences == 0:
         logging.info(f"No differences found between the two JSON files for map '{map_name}'.")
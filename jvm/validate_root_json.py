@@ -20,6 +20,8 @@ from pathlib import Path
 import numpy as np
 import uproot
 
+from validation_utils import edges_match
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -46,10 +48,11 @@ def load_root_histogram(root_file_path: str, histogram_name: str):
             raise FileNotFoundError(f"ROOT file '{root_file_path}' does not exist.")
 
         with uproot.open(root_file_path) as file:
-            if histogram_name not in file:
-                raise KeyError(f"Histogram '{histogram_name}' not found in '{root_file_path}'.")
-
-            histogram = file[histogram_name].to_hist()
+            # A single lookup; uproot raises KeyInFileError (a KeyError) if missing
+            try:
+                histogram = file[histogram_name].to_hist()
+            except KeyError:
+                raise KeyError(f"Histogram '{histogram_name}' not found in '{root_file_path}'.") from None
             x_edges, y_edges = histogram.axes.edges
             bin_contents = histogram.values().flatten()
 
@@ -85,13 +88,11 @@ def load_json_map(json_file_path: str, map_name: str):
         if not json_path.exists():
             raise FileNotFoundError(f"JSON file '{json_file_path}' does not exist.")
 
-        # Determine if the JSON is compressed
+        # Determine if the JSON is compressed; decompress in one call and let
+        # json.loads decode the bytes, instead of a text-mode gzip stream
+        json_content = json_path.read_bytes()
         if json_path.suffix == '.gz':
-            with gzip.open(json_path, 'rt') as f:
-                json_content = f.read()
-        else:
-            with open(json_path, 'r') as f:
-                json_content = f.read()
+            json_content = gzip.decompress(json_content)
 
         # Parse JSON content
         data = json.loads(json_content)
@@ -121,9 +122,10 @@ def load_json_map(json_file_path: str, map_name: str):
                 if len(edges) != 2:
                     raise ValueError(f"Map '{map_name}' does not have two edge arrays.")
 
-                x_edges = np.array(edges[0]).flatten()
-                y_edges = np.array(edges[1]).flatten()
-                bin_contents = np.array(value.get("content", [])).flatten()
+                # The JSON lists are already flat; convert them without extra copies
+                x_edges = np.asarray(edges[0], dtype=np.float64)
+                y_edges = np.asarray(edges[1], dtype=np.float64)
+                bin_contents = np.asarray(value.get("content", []), dtype=np.float64)
 
                 return x_edges, y_edges, bin_contents
 
@@ -155,38 +157,37 @@ def compare_histograms(root_hist: tuple, json_hist: tuple, map_name: str, tolera
     x_edges_json, y_edges_json, bin_contents_json = json_hist
 
     # Compare bin edges
-    if not np.allclose(x_edges_root, x_edges_json, atol=tolerance):
+    if not edges_match(x_edges_root, x_edges_json, tolerance):
         logging.error(f"X edges mismatch for map '{map_name}'.")
         sys.exit(1)
-    if not np.allclose(y_edges_root, y_edges_json, atol=tolerance):
+    if not edges_match(y_edges_root, y_edges_json, tolerance):
         logging.error(f"Y edges mismatch for map '{map_name}'.")
         sys.exit(1)
 
-    num_bins = len(bin_contents_root)
-    if len(bin_contents_json) != num_bins:
-        logging.error(f"Number of bins mismatch for map '{map_name}': ROOT has {num_bins}, JSON has {len(bin_contents_json)}.")
+    bin_contents_root = np.asarray(bin_contents_root, dtype=np.float64)
+    bin_contents_json = np.asarray(bin_contents_json, dtype=np.float64)
+    num_bins = bin_contents_root.size
+    if bin_contents_json.size != num_bins:
+        logging.error(f"Number of bins mismatch for map '{map_name}': ROOT has {num_bins}, JSON has {bin_contents_json.size}.")
         sys.exit(1)
 
-    differences = 0
-
     logging.info(f"Comparing histograms for map '{map_name}':")
     logging.info(f"Total number of bins: {num_bins}")
 
     # Determine the number of phi bins from y_edges
     num_phi_bins = len(y_edges_root) - 1
 
-    for idx in range(num_bins):
-        root_val = bin_contents_root[idx]
-        json_val = bin_contents_json[idx]
-        diff = root_val - json_val
-        if abs(diff) > tolerance:
-            differences += 1
-            # Calculate bin indices (assuming eta varies first, then phi)
-            eta_bin = (idx // num_phi_bins) + 1
-            phi_bin = (idx % num_phi_bins) + 1
-            logging.warning(
-                f"Difference found in bin (eta_bin={eta_bin}, phi_bin={phi_bin}): ROOT={root_val}, JSON={json_val}, Diff={diff}"
-            )
+    # Find all differing bins at once; only those are visited in Python
+    diff = bin_contents_root - bin_contents_json
+    idxs = np.flatnonzero(np.abs(diff) > tolerance)
+    differences = int(idxs.size)
+
+    # Calculate bin indices (assuming eta varies first, then phi)
+    eta_bins, phi_bins = np.divmod(idxs, num_phi_bins)
+    for idx, eta_bin, phi_bin in zip(idxs, eta_bins + 1, phi_bins + 1):
+        logging.warning(
+            f"Difference found in bin (eta_bin={eta_bin}, phi_bin={phi_bin}): ROOT={bin_contents_root[idx]}, JSON={bin_contents_json[idx]}, Diff={diff[idx]}"
+        )
 
     if differences == 0:
         logging.info(f"No differences found between ROOT and JSON for map '{map_name}'.")
@@ -12,51 +12,51 @@ Description:
 import argparse
 import logging
 import sys
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import uproot
 
+from validation_utils import edges_match
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
-def load_root_histogram(root_file_path: str, histogram_name: str):
+def load_root_histograms(root_file_path: str, histogram_names: list) -> dict:
     """
-    Loads a histogram from a ROOT file.
+    Loads several histograms from a ROOT file, opening it only once.
 
     Args:
         root_file_path (str): Path to the ROOT file.
-        histogram_name (str): Name of the histogram to load.
+        histogram_names (list): Names of the histograms to load.
 
     Returns:
-        tuple: (x_edges, y_edges, bin_contents) if successful.
+        dict: Maps each name to its (x_edges, y_edges, bin_contents) tuple.
 
     Raises:
         FileNotFoundError: If the ROOT file does not exist.
-        KeyError: If the histogram is not found in the ROOT file.
+        KeyError: If a histogram is not found in the ROOT file.
     """
-    try:
-        root_path = Path(root_file_path)
-        if not root_path.exists():
-            raise FileNotFoundError(f"ROOT file '{root_file_path}' does not exist.")
-
-        with uproot.open(root_file_path) as file:
-            if histogram_name not in file:
-                raise KeyError(f"Histogram '{histogram_name}' not found in '{root_file_path}'.")
-
-            histogram = file[histogram_name].to_hist()
-            x_edges, y_edges = histogram.axes.edges
-            bin_contents = histogram.values().flatten()
-
-            # Ensure edges are one-dimensional
-            x_edges = np.asarray(x_edges).flatten()
-            y_edges = np.asarray(y_edges).flatten()
-
-            return x_edges, y_edges, bin_contents
-
-    except Exception as e:
-        logging.error(f"Error loading histogram from ROOT file: {e}")
-        sys.exit(1)
+    # uproot.open raises FileNotFoundError itself, so no separate stat() first
+    histograms = {}
+    with uproot.open(root_file_path) as file:
+        for histogram_name in histogram_names:
+            # A single lookup; uproot raises KeyInFileError (a KeyError) if missing
+            try:
+                histogram = file[histogram_name]
+            except KeyError:
+                raise KeyError(f"Histogram '{histogram_name}' not found in '{root_file_path}'.") from None
+
+            # Read edges and values straight from the uproot model, without
+            # building a hist/boost-histogram object
+            x_edges = histogram.axis(0).edges()
+            y_edges = histogram.axis(1).edges()
+            # uproot's edges are already 1D; ravel is a view on the contiguous values
+            bin_contents = np.ascontiguousarray(histogram.values(), dtype=np.float64).ravel()
+
+            histograms[histogram_name] = (x_edges, y_edges, bin_contents)
+
+    return histograms
 
 def compare_histograms(old_hist: tuple, new_hist: tuple, histogram_name: str, tolerance: float = 1e-6):
     """
@@ -70,46 +70,53 @@ def compare_histograms(old_hist: tuple, new_hist: tuple, histogram_name: str, to
 
     Returns:
         int: Number of differing bins.
+
+    Raises:
+        ValueError: If the edges or the number of bins do not match.
     """
     x_edges_old, y_edges_old, bin_contents_old = old_hist
     x_edges_new, y_edges_new, bin_contents_new = new_hist
 
     # Compare bin edges
-    if not np.allclose(x_edges_old, x_edges_new, atol=tolerance):
-        logging.error(f"X edges mismatch for histogram '{histogram_name}'.")
-        sys.exit(1)
-    if not np.allclose(y_edges_old, y_edges_new, atol=tolerance):
-        logging.error(f"Y edges mismatch for histogram '{histogram_name}'.")
-        sys.exit(1)
+    if not edges_match(x_edges_old, x_edges_new, tolerance):
+        raise ValueError(f"X edges mismatch for histogram '{histogram_name}'.")
+    if not edges_match(y_edges_old, y_edges_new, tolerance):
+        raise ValueError(f"Y edges mismatch for histogram '{histogram_name}'.")
 
-    num_bins_old = len(bin_contents_old)
-    num_bins_new = len(bin_contents_new)
+    bin_contents_old = np.ascontiguousarray(bin_contents_old, dtype=np.float64)
+    bin_contents_new = np.ascontiguousarray(bin_contents_new, dtype=np.float64)
+    num_bins_old = bin_contents_old.size
+    num_bins_new = bin_contents_new.size
 
     if num_bins_new != num_bins_old:
-        logging.error(f"Number of bins mismatch for histogram '{histogram_name}': Old ROOT has {num_bins_old} bins, New ROOT has {num_bins_new} bins.")
-        sys.exit(1)
-
-    differences = 0
+        raise ValueError(f"Number of bins mismatch for histogram '{histogram_name}': Old ROOT has {num_bins_old} bins, New ROOT has {num_bins_new} bins.")
 
     logging.info(f"Comparing histograms for '{histogram_name}':")
     logging.info(f"Total number of bins: {num_bins_old}")
 
+    # Identical contents, the usual outcome of a regression check, need no diff pass
+    if np.array_equal(bin_contents_old, bin_contents_new):
+        logging.info(f"No differences found between the two ROOT files for histogram '{histogram_name}'.")
+        return 0
+
     # Determine the number of phi bins from y_edges
     num_phi_bins = len(y_edges_old) - 1
 
-    for idx in range(num_bins_old):
-        old_val = bin_contents_old[idx]
-        new_val = bin_contents_new[idx]
-        diff = new_val - old_val  # Difference: new - old
-
-        if abs(diff) > tolerance:
-            differences += 1
-            # Calculate bin indices (assuming eta varies first, then phi)
-            eta_bin = (idx // num_phi_bins) + 1
-            phi_bin = (idx % num_phi_bins) + 1
-            logging.warning(
-                f"Difference found in bin (eta_bin={eta_bin}, phi_bin={phi_bin}): Old ROOT={old_val}, New ROOT={new_val}, Diff={diff}"
-            )
+    # Find all differing bins at once; only those are visited in Python
+    diff = bin_contents_new - bin_contents_old  # Difference: new - old
+    idxs = np.flatnonzero(np.abs(diff) > tolerance)
+    differences = int(idxs.size)
+
+    # Calculate bin indices (assuming eta varies first, then phi)
+    eta_bins, phi_bins = np.divmod(idxs, num_phi_bins)
+    # Report all differing bins in a single log record
+    if differences and logging.getLogger().isEnabledFor(logging.WARNING):
+        rows = zip((eta_bins + 1).tolist(), (phi_bins + 1).tolist(),
+                   bin_contents_old[idxs].tolist(), bin_contents_new[idxs].tolist(), diff[idxs].tolist())
+        logging.warning("\n".join(
+            f"Difference found in bin (eta_bin={eta_bin}, phi_bin={phi_bin}): Old ROOT={old_val}, New ROOT={new_val}, Diff={d}"
+            for eta_bin, phi_bin, old_val, new_val, d in rows
+        ))
 
     if differences == 0:
         logging.info(f"No differences found between the two ROOT files for histogram '{histogram_name}'.")
@@ -141,7 +148,7 @@ def parse_arguments():
     parser.add_argument(
         '-m', '--histogram-name',
         required=True,
-        help="Name of the histogram to validate (e.g., 'jetvetomap')."
+        help="Name of the histogram to validate (e.g., 'jetvetomap'), or a comma-separated list of names."
     )
     parser.add_argument(
         '-t', '--tolerance',
@@ -149,7 +156,13 @@ def parse_arguments():
         default=1e-6,
         help="Tolerance level for bin content differences. Defaults to 1e-6."
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+
+    # Split the comma-separated histogram list; an empty list would "pass" trivially
+    args.histogram_names = [name.strip() for name in args.histogram_name.split(',') if name.strip()]
+    if not args.histogram_names:
+        parser.error("-m/--histogram-name must name at least one histogram.")
+    return args
 
 def main():
     """
@@ -159,27 +172,39 @@ def main():
 
     old_root_file = args.old_root
     new_root_file = args.new_root
-    histogram_name = args.histogram_name
+    histogram_names = args.histogram_names
     tolerance = args.tolerance
 
-    logging.info(f"Starting validation for histogram '{histogram_name}'.")
+    logging.info(f"Starting validation for histogram(s) {', '.join(repr(name) for name in histogram_names)}.")
     logging.info(f"Old ROOT file: {old_root_file}")
     logging.info(f"New ROOT file: {new_root_file}")
     logging.info(f"Tolerance: {tolerance}")
 
-    # Load histograms from both ROOT files
-    old_hist = load_root_histogram(old_root_file, histogram_name)
-    new_hist = load_root_histogram(new_root_file, histogram_name)
-
-    # Compare histograms
-    differences = compare_histograms(old_hist, new_hist, histogram_name, tolerance)
-
-    if differences == 0:
-        logging.info(f"Validation successful: No differences found for histogram '{histogram_name}'.")
-    else:
-        logging.warning(f"Validation completed: {differences} differing bins found for histogram '{histogram_name}'. Please review the discrepancies.")
+    # Load histograms from both ROOT files concurrently; uproot's file reads
+    # and decompression release the GIL, so the two loads overlap
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            old_future = executor.submit(load_root_histograms, old_root_file, histogram_names)
+            new_future = executor.submit(load_root_histograms, new_root_file, histogram_names)
+            old_hists, new_hists = old_future.result(), new_future.result()
+    except Exception as e:
+        logging.error(f"Error loading histogram from ROOT file: {e}")
+        sys.exit(1)
 
-    sys.exit(0 if differences == 0 else 1)
+    # Compare histograms; a mismatch in one does not stop the others
+    differences = 0
+    failed = 0
+    for histogram_name in histogram_names:
+        try:
+            found = compare_histograms(old_hists[histogram_name], new_hists[histogram_name], histogram_name, tolerance)
+        except ValueError as e:
+            logging.error(str(e))
+            failed += 1
+            continue
+        # compare_histograms has already logged the outcome for this histogram
+        differences += found
+
+    sys.exit(0 if differences == 0 and failed == 0 else 1)
 
 if __name__ == "__main__":
     main()
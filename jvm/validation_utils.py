@@ -0,0 +1,26 @@
+"""
+Helpers shared by the jet veto map validators
+(validate_json_json.py, validate_root_json.py, validate_root_root.py).
+"""
+
+import numpy as np
+
+
+def edges_match(edges_a, edges_b, tolerance: float) -> bool:
+    """
+    Checks whether two edge arrays agree, exactly or within the tolerance.
+
+    Edges written by the same code are normally bit-identical, so the exact
+    comparison is tried first and np.allclose is only the fallback.
+
+    Args:
+        edges_a (numpy.ndarray): First edge array.
+        edges_b (numpy.ndarray): Second edge array.
+        tolerance (float): Absolute tolerance for the np.allclose fallback.
+
+    Returns:
+        bool: True if the edges have the same shape and agree.
+    """
+    if edges_a.shape != edges_b.shape:
+        return False
+    return np.array_equal(edges_a, edges_b) or np.allclose(edges_a, edges_b, atol=tolerance)